@@ -7,6 +7,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 from collections import Counter
 import altair as alt
+import re
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 
 # Configuration de la page
@@ -51,6 +54,90 @@ def load_data():
     
     return sentiments_df, topics_df, trending_words_df
 
+# Chemin de l'index de recherche construit par "Scraping & Analysis/search_index.py"
+def get_search_index_path():
+    current_dir = Path(__file__).resolve().parent
+    index_path = current_dir.parent / 'Scraping & Analysis' / 'data_processed' / 'search_index.db'
+    return index_path if index_path.exists() else None
+
+# Nombre maximal de résultats classés par recherche
+MAX_SEARCH_RESULTS = 10000
+
+# Fonction pour rechercher des commentaires dans l'index FTS5
+def search_comments(index_path, query, sentiment=None, date_min=None, date_max=None, page=1, page_size=10):
+    # Chaque mot est mis entre guillemets pour neutraliser la syntaxe FTS5 (AND, OR, *, ...)
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return 0, pd.DataFrame()
+    fts_query = " ".join(f'"{term}"' for term in terms)
+
+    # Une connexion en lecture seule par recherche: les sessions Streamlit tournent dans des threads différents
+    with closing(sqlite3.connect(f"file:{index_path.as_posix()}?mode=ro", uri=True)) as con:
+        filters = ["comments_fts MATCH ?"]
+        params = [fts_query]
+
+        # Les commentaires sont triés par date dans l'index: une période correspond à un intervalle d'identifiants
+        if date_min is not None:
+            first = con.execute(
+                "SELECT id FROM comments WHERE date_normalized >= ? ORDER BY date_normalized, id LIMIT 1",
+                [f"{date_min} 00:00:00"]
+            ).fetchone()
+            if first is None:
+                return 0, pd.DataFrame()
+            filters.append("comments_fts.rowid >= ?")
+            params.append(first[0])
+        if date_max is not None:
+            last = con.execute(
+                "SELECT id FROM comments WHERE date_normalized <= ? ORDER BY date_normalized DESC, id DESC LIMIT 1",
+                [f"{date_max} 23:59:59"]
+            ).fetchone()
+            if last is None:
+                return 0, pd.DataFrame()
+            filters.append("comments_fts.rowid <= ?")
+            params.append(last[0])
+        if sentiment is not None:
+            filters.append("c.sentiment = ?")
+            params.append(str(sentiment))
+        where = " AND ".join(filters)
+
+        # Seuls les MAX_SEARCH_RESULTS commentaires les plus récents sont classés par pertinence (BM25),
+        # les mots du texte comptant plus que les lemmes. La mise en évidence n'est calculée que pour la page affichée.
+        # CROSS JOIN force SQLite à parcourir l'index FTS5 en premier, puis à filtrer les résultats
+        results = pd.read_sql_query(
+            f"""
+            WITH candidates AS MATERIALIZED (
+                SELECT comments_fts.rowid AS id, bm25(comments_fts, 1.0, 0.5) AS score
+                FROM comments_fts
+                CROSS JOIN comments c ON c.id = comments_fts.rowid
+                WHERE {where}
+                ORDER BY comments_fts.rowid DESC
+                LIMIT ?
+            ),
+            page AS (
+                SELECT id, score FROM candidates
+                ORDER BY score
+                LIMIT ? OFFSET min(?, max((SELECT count(*) FROM candidates) - 1, 0) / ? * ?)
+            )
+            SELECT (SELECT count(*) FROM candidates) AS total,
+                   c.date_normalized AS date,
+                   c.sentiment,
+                   highlight(comments_fts, 0, '**', '**') AS texte,
+                   snippet(comments_fts, 1, '**', '**', '...', 16) AS lemmes,
+                   page.score
+            FROM page
+            CROSS JOIN comments_fts ON comments_fts.rowid = page.id
+            CROSS JOIN comments c ON c.id = page.id
+            WHERE comments_fts MATCH ?
+            ORDER BY page.score
+            """,
+            con,
+            params=params + [MAX_SEARCH_RESULTS, page_size, (page - 1) * page_size, page_size, page_size, fts_query]
+        )
+
+    if results.empty:
+        return 0, results
+    return int(results['total'].iloc[0]), results.drop(columns='total')
+
 # Style CSS personnalisé
 st.markdown("""
 <style>
@@ -304,8 +391,8 @@ elif page == "Analyse des sentiments":
     sentiment_to_show = st.selectbox("Choisir un sentiment à explorer:", unique_sentiments)
     
     # Mapper le sentiment textuel au numérique si nécessaire
+    reverse_map = {'négatif': -1, 'neutre': 0, 'positif': 1, 'unknown': 'UNKNOWN'}
     if sentiment_to_show in ['positif', 'neutre', 'négatif', 'unknown']:
-        reverse_map = {'négatif': -1, 'neutre': 0, 'positif': 1, 'unknown': 'UNKNOWN'}
         sentiment_value = reverse_map.get(sentiment_to_show, sentiment_to_show)
     else:
         sentiment_value = sentiment_to_show
@@ -317,15 +404,67 @@ elif page == "Analyse des sentiments":
     if text_column:
         # Filtrer les textes pour le sentiment sélectionné
         filter_col = 'sentiment' if 'sentiment_text' not in sentiments_df.columns else sentiment_col
-        filtered_texts = sentiments_df[sentiments_df[filter_col] == sentiment_value][text_column].sample(
-            min(5, len(sentiments_df[sentiments_df[filter_col] == sentiment_value]))
-        ).tolist()
+        sentiment_texts = sentiments_df.loc[sentiments_df[filter_col] == sentiment_value, text_column]
+        filtered_texts = sentiment_texts.sample(min(5, len(sentiment_texts))).tolist()
         
         for i, text in enumerate(filtered_texts):
             st.markdown(f"**Exemple {i+1}:** {text}")
     else:
         st.info("Les textes originaux ne sont pas disponibles dans les données.")
 
+    # Recherche plein texte dans les commentaires
+    st.markdown("### Rechercher dans les commentaires")
+
+    search_index_path = get_search_index_path()
+    if search_index_path is None:
+        st.info("L'index de recherche n'est pas disponible. Lancez le script search_index.py pour le construire.")
+    else:
+        search_query = st.text_input("Mots-clés ou lemmes à rechercher:")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            search_sentiment = st.selectbox("Filtrer par sentiment:", ["Tous"] + list(unique_sentiments))
+        with col2:
+            if 'date' in sentiments_df.columns and sentiments_df['date'].notna().any():
+                date_range = st.date_input(
+                    "Période:",
+                    value=(sentiments_df['date'].min().date(), sentiments_df['date'].max().date())
+                )
+            else:
+                date_range = ()
+
+        if search_query:
+            if search_sentiment == "Tous":
+                search_sentiment_value = None
+            else:
+                search_sentiment_value = reverse_map.get(search_sentiment, search_sentiment)
+            date_min, date_max = date_range if len(date_range) == 2 else (None, None)
+
+            page_size = 10
+            search_page = st.number_input("Page:", min_value=1, value=1, step=1)
+            total_results, search_results = search_comments(
+                search_index_path, search_query, search_sentiment_value, date_min, date_max, search_page, page_size
+            )
+
+            if total_results == 0:
+                st.info("Aucun commentaire ne correspond à cette recherche.")
+            else:
+                nb_pages = (total_results - 1) // page_size + 1
+                if total_results >= MAX_SEARCH_RESULTS:
+                    st.warning(
+                        f"Plus de {MAX_SEARCH_RESULTS:,} résultats: seuls les {MAX_SEARCH_RESULTS:,} commentaires "
+                        "les plus récents sont classés. Précisez la recherche, le sentiment ou la période."
+                    )
+                st.markdown(f"**{total_results:,}** résultats - page {min(search_page, nb_pages)}/{nb_pages}")
+                # L'index stocke les sentiments sous forme de texte
+                index_sentiment_map = {str(k): v for k, v in sentiment_map.items()}
+                for _, row in search_results.iterrows():
+                    label = index_sentiment_map.get(row['sentiment'], row['sentiment'])
+                    st.markdown(f"*{row['date']} - {label}*  \n{row['texte']}")
+                    # Le mot ne figure que sous forme de lemme: afficher les lemmes correspondants
+                    if not row['texte'] or '**' not in row['texte']:
+                        st.markdown(f"Lemmes: {row['lemmes']}")
+
 # Page de modélisation des topics
 elif page == "Modélisation des thèmes":
     st.markdown('<div class="sub-header">Analyse détaillée des topics</div>', unsafe_allow_html=True)
@@ -0,0 +1,102 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+# Paths of the sentiment dataset (output of sentiment_analysis.ipynb) and of the search index
+DATA_DIR = Path(__file__).resolve().parent / 'data_processed'
+CSV_SENTIMENT = DATA_DIR / 'data_sentiment_finetuned_m.csv'
+INDEX_PATH = DATA_DIR / 'search_index.db'
+
+# Columns kept in the index
+COLUMNS = ['date_normalized', 'sentiment', 'text_processed', 'cleanned_text']
+
+# Number of CSV rows loaded in memory at once
+CHUNK_SIZE = 100_000
+
+
+def build_index(csv_path=CSV_SENTIMENT, index_path=INDEX_PATH, chunk_size=CHUNK_SIZE):
+    """Build a SQLite FTS5 full-text index over the comment corpus."""
+    index_path = Path(index_path)
+    # The index is always rebuilt from scratch, then moved in place once complete
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        nb_rows = _fill_index(con, csv_path, chunk_size)
+        con.commit()
+    except BaseException:
+        con.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    con.close()
+
+    tmp_path.replace(index_path)
+    print(f"Search index saved to {index_path} ({nb_rows} rows)")
+
+
+def _fill_index(con, csv_path, chunk_size):
+    con.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+
+        CREATE TEMP TABLE staging (
+            date_normalized TEXT,
+            sentiment TEXT,
+            text_processed TEXT,
+            cleanned_text TEXT
+        );
+
+        CREATE TABLE comments (
+            id INTEGER PRIMARY KEY,
+            date_normalized TEXT,
+            sentiment TEXT,
+            text_processed TEXT,
+            cleanned_text TEXT
+        );
+
+        -- External content table: the texts are stored only once, in "comments"
+        -- "remove_diacritics 2" lets "etat" match "état"
+        CREATE VIRTUAL TABLE comments_fts USING fts5(
+            text_processed,
+            cleanned_text,
+            content = 'comments',
+            content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """)
+
+    nb_rows = 0
+    # Sentiment is read as text: the column mixes -1/0/1 with "UNKNOWN", "EMPTY", "ERROR"
+    for chunk in pd.read_csv(csv_path, usecols=COLUMNS, dtype=str, chunksize=chunk_size, encoding='utf-8'):
+        chunk = chunk[COLUMNS].astype(object).where(chunk.notna(), None)
+        con.executemany(
+            "INSERT INTO staging (date_normalized, sentiment, text_processed, cleanned_text) VALUES (?, ?, ?, ?)",
+            chunk.itertuples(index=False, name=None)
+        )
+        nb_rows += len(chunk)
+        print(f"{nb_rows} rows loaded")
+
+    # Comments are numbered by date, so that a period of the dashboard is a range of ids,
+    # which FTS5 can seek to directly instead of reading the whole posting list
+    con.execute("""
+        INSERT INTO comments (date_normalized, sentiment, text_processed, cleanned_text)
+        SELECT date_normalized, sentiment, text_processed, cleanned_text FROM staging
+        ORDER BY date_normalized
+    """)
+    con.execute("DROP TABLE staging")
+
+    # Posting lists are built in a single pass once all rows are inserted, then merged
+    con.execute("INSERT INTO comments_fts (comments_fts) VALUES ('rebuild')")
+    con.execute("INSERT INTO comments_fts (comments_fts) VALUES ('optimize')")
+
+    # Index used to turn the dates of the dashboard into a range of ids
+    con.execute("CREATE INDEX idx_comments_date ON comments (date_normalized)")
+    con.execute("ANALYZE")
+    return nb_rows
+
+
+# Build the index once the sentiment analysis is done
+if __name__ == "__main__":
+    build_index()